@@ -3,14 +3,20 @@ API Client module for interacting with the Embedding Files API.
 This module handles authentication, downloading files, and updating file statuses.
 """
 import os
-import logging
+import orjson
 import requests
 import shutil
+import threading
+import time
+import random
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional, Any
-from destination_srv import extract_cap_credentials, fetch_destination_details,get_destination_service_credentials, generate_token
+from destination_srv import extract_cap_credentials, fetch_destination_details,get_destination_service_credentials, generate_token, http_session, token_endpoint
+from logger_setup import get_logger
 
-logger = logging.getLogger('EarningsAnalysis: api_client')
-logger.setLevel(logging.INFO)
+# Shared configured logger; this module previously created two differently
+# named loggers that bypassed the common handlers and DEBUG flag
+logger = get_logger()
 
 ### ------------------- Read VCAP Services from CF --------------------###
 
@@ -20,7 +26,7 @@ logger.info(f"Destination Service Credentials: {destination_service_credentials}
 # Generate OAuth token for destination service
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -62,20 +68,96 @@ AUTH_URL = "https://development-40qq74qu.authentication.us10.hana.ondemand.com/o
 CLIENT_ID = "sb-earning-upload!t111507"
 CLIENT_SECRET = "316ed684-d170-4fbc-8b1f-d17d39dd2f37$1Ys99tjFNy-VafIDh7-JQB5P7x6wvWOOQ9rP9g3pu0k="
 
+# Listing URL built once; both the mapping fetch and the download path reuse it
+APPROVED_FILES_URL = f"{EMBEDDING_API_BASE_URL}?$filter=status eq 'Approved'&$select=ID,fileName"
 
-# Configure logging
-logger = logging.getLogger('EarningsAnalysis.APIClient')
+
+# In-flight token request shared across threads, so concurrent callers
+# (e.g. parallel status updates) coalesce onto a single POST to the auth server
+_token_lock = threading.Lock()
+_token_future: Optional[Future] = None
+
+# Cached token plus the moment we should proactively refresh it; a daemon
+# timer renews the token shortly before expiry so request-path callers
+# almost always get a plain cached read instead of a blocking POST
+_cached_token: Optional[str] = None
+_refresh_at: float = 0.0
+_refresh_timer: Optional[threading.Timer] = None
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry to refresh
+TOKEN_REFRESH_JITTER = 300  # max random seconds subtracted from the refresh deadline
+
+def _store_token(token: str, expires_in: Any) -> None:
+    """Cache a fresh token and schedule its background refresh."""
+    global _cached_token, _refresh_at, _refresh_timer
+    _cached_token = token
+    try:
+        lifetime = float(expires_in)
+    except (TypeError, ValueError):
+        lifetime = 3600.0
+    # Random jitter so app instances started together don't all hit the
+    # auth server at the same synchronized moment
+    delay = max(lifetime - TOKEN_REFRESH_MARGIN - random.uniform(0, TOKEN_REFRESH_JITTER), 60.0)
+    _refresh_at = time.time() + delay
+    if _refresh_timer is not None:
+        _refresh_timer.cancel()
+    _refresh_timer = threading.Timer(delay, get_auth_token)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+def invalidate_auth_token() -> None:
+    """Drop the cached token so the next get_auth_token() fetches a fresh one.
+
+    Called when the API answers 401 despite a token we believed valid
+    (e.g. revoked out-of-band before its expiry).
+    """
+    global _cached_token, _refresh_at
+    _cached_token = None
+    _refresh_at = 0.0
 
 def get_auth_token() -> Optional[str]:
     """
-    Get OAuth token for API calls
-    
+    Get OAuth token for API calls.
+    Concurrent callers share one in-flight request instead of each
+    firing their own POST against the auth server.
+
+    Returns:
+        str or None: Access token if successful, None otherwise
+    """
+    global _token_future
+    if _cached_token is not None and time.time() < _refresh_at:
+        return _cached_token
+    with _token_lock:
+        future = _token_future
+        if future is not None:
+            # Another thread is already fetching; wait for its result
+            is_owner = False
+        else:
+            future = _token_future = Future()
+            is_owner = True
+    if not is_owner:
+        return future.result()
+    try:
+        token = _request_auth_token()
+        future.set_result(token)
+        return token
+    finally:
+        if not future.done():
+            future.set_result(None)
+        with _token_lock:
+            _token_future = None
+
+def _request_auth_token() -> Optional[str]:
+    """
+    Request a fresh OAuth token from the auth server
+
     Returns:
         str or None: Access token if successful, None otherwise
     """
     try:
         logger.info("Requesting OAuth token")
-        r = requests.post(AUTH_URL, data={
+        # Reuse the pooled session from destination_srv rather than opening a
+        # second connection pool for the same auth host
+        r = http_session.post(AUTH_URL, data={
             "grant_type": "client_credentials",
             "client_id": CLIENT_ID,
             "client_secret": CLIENT_SECRET
@@ -85,18 +167,46 @@ def get_auth_token() -> Optional[str]:
             logger.error(f"Authentication failed: Status {r.status_code}, Response: {r.text}")
             return None
         
-        token = r.json().get("access_token")
-        logger.info("Token Generated for Status Update", token)
+        payload = orjson.loads(r.content)
+        token = payload.get("access_token")
+        logger.info("Token generated for status update")
         if not token:
             logger.error("No access token received")
             return None
-        
+
+        _store_token(token, payload.get("expires_in"))
         logger.info("OAuth token acquired")
         return token
     except Exception as e:
         logger.error(f"Error getting auth token: {str(e)}")
         return None
 
+# Header dicts are rebuilt only when the token changes, not on every call
+_cached_headers_token: Optional[str] = None
+_cached_headers: Dict[str, str] = {}
+_cached_json_headers: Dict[str, str] = {}
+
+def _bearer_headers(token: str, json_content: bool = False) -> Dict[str, str]:
+    """
+    Get request headers for the given token, cached across calls.
+
+    Args:
+        token (str): Bearer token for the API
+        json_content (bool): Include a JSON Content-Type header
+
+    Returns:
+        dict: Headers ready to pass to the HTTP call
+    """
+    global _cached_headers_token, _cached_headers, _cached_json_headers
+    if token != _cached_headers_token:
+        _cached_headers = {"Authorization": f"Bearer {token}"}
+        _cached_json_headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        _cached_headers_token = token
+    return _cached_json_headers if json_content else _cached_headers
+
 def update_file_status(file_id: str, status: str = "Completed") -> bool:
     """
     Update the status of a file in the EmbeddingFiles API
@@ -115,20 +225,27 @@ def update_file_status(file_id: str, status: str = "Completed") -> bool:
         
         # Build the URL for the specific file
         file_url = f"{EMBEDDING_API_BASE_URL}('{file_id}')"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        
-        # Data for the PATCH request
-        data = {
-            "status": status
-        }
-        
+        headers = _bearer_headers(token, json_content=True)
+
+        # Body for the PATCH request, encoded once with orjson; the headers
+        # already carry the JSON Content-Type, so requests sends the bytes
+        # as-is instead of re-encoding a dict per attempt
+        body = orjson.dumps({"status": status})
+
         # Make the PATCH request
         logger.info(f"Updating file {file_id} status to {status}")
-        response = requests.patch(file_url, headers=headers, json=data)
-        
+        response = http_session.patch(file_url, headers=headers, data=body)
+
+        if response.status_code == 401:
+            # Token rejected before its expected expiry: refetch once and retry
+            logger.warning("Received 401; refreshing auth token and retrying")
+            invalidate_auth_token()
+            token = get_auth_token()
+            if not token:
+                return False
+            headers = _bearer_headers(token, json_content=True)
+            response = http_session.patch(file_url, headers=headers, data=body)
+
         if response.status_code in [200, 201, 204]:
             logger.info(f"Successfully updated file {file_id} status to {status}")
             return True
@@ -139,40 +256,59 @@ def update_file_status(file_id: str, status: str = "Completed") -> bool:
         logger.error(f"Error updating file status: {str(e)}")
         return False
 
+# Conditional-GET state for the file-mapping list: remember the last ETag and
+# the mapping parsed from it, so an unchanged list costs a 304 with no body
+_mappings_lock = threading.Lock()
+_mappings_etag: Optional[str] = None
+_mappings_cache: Dict[str, str] = {}
+
 def get_file_mappings() -> Dict[str, str]:
     """
     Get mapping of filenames to file IDs from the API
-    
+
     Returns:
         dict: Dictionary mapping filenames to file IDs
     """
+    global _mappings_etag, _mappings_cache
     try:
         token = get_auth_token()
         if not token:
             return {}
-        
-        headers = {"Authorization": f"Bearer {token}"}
-        file_list_url = f"{EMBEDDING_API_BASE_URL}?$filter=status eq 'Approved'"
-        
+
+        headers = dict(_bearer_headers(token))
+        with _mappings_lock:
+            if _mappings_etag:
+                headers['If-None-Match'] = _mappings_etag
+        file_list_url = APPROVED_FILES_URL
+
         logger.info(f"Fetching file list from {file_list_url}")
-        response = requests.get(file_list_url, headers=headers)
-        
+        response = http_session.get(file_list_url, headers=headers)
+
+        if response.status_code == 304:
+            # List unchanged on the server; skip the parse entirely
+            with _mappings_lock:
+                logger.info(f"File list unchanged (304); reusing {len(_mappings_cache)} cached mappings")
+                return dict(_mappings_cache)
+
         if response.status_code != 200:
             logger.error(f"Failed to fetch file list: Status {response.status_code}, Response: {response.text}")
             return {}
-        
-        files = response.json().get('value', [])
-        
-        # Create a mapping of filename to file ID
-        file_mappings = {}
-        for file in files:
-            file_name = file.get('fileName')
-            file_id = file.get('ID')
-            if file_name and file_id:
-                file_mappings[file_name] = file_id
-        
+
+        files = orjson.loads(response.content).get('value', [])
+
+        # Create a mapping of filename to file ID in a single comprehension pass
+        file_mappings = {
+            file.get('fileName'): file.get('ID')
+            for file in files
+            if file.get('fileName') and file.get('ID')
+        }
+
+        with _mappings_lock:
+            _mappings_etag = response.headers.get('ETag')
+            _mappings_cache = file_mappings
+
         logger.info(f"Found {len(file_mappings)} Submitted files")
-        return file_mappings
+        return dict(file_mappings)
     except Exception as e:
         logger.error(f"Error getting file mappings: {str(e)}")
         return {}
@@ -198,16 +334,16 @@ def download_embedding_files(documents_dir: str, images_dir: str, image_extensio
             return []
         
         # Fetch Submitted files
-        headers = {"Authorization": f"Bearer {token}"}
-        file_list_url = f"{EMBEDDING_API_BASE_URL}?$filter=status eq 'Approved'"
+        headers = _bearer_headers(token)
+        file_list_url = APPROVED_FILES_URL
         logger.info(f"Fetching file list from {file_list_url}")
-        r = requests.get(file_list_url, headers=headers)
+        r = http_session.get(file_list_url, headers=headers)
         
         if r.status_code != 200:
             logger.error(f"Failed to fetch file list: Status {r.status_code}, Response: {r.text}")
             return []
         
-        files = r.json().get('value', [])
+        files = orjson.loads(r.content).get('value', [])
         logger.info(f"Found {len(files)} Submitted files")
         
         if not files:
@@ -215,43 +351,56 @@ def download_embedding_files(documents_dir: str, images_dir: str, image_extensio
             return []
         
         # Track successful downloads
-        successful_downloads = 0
         total_files = len(files)
-        
-        # Download each file individually
-        for file in files:
+
+        def download_one(file: Dict[str, Any]) -> Optional[str]:
+            """Download a single file; returns the saved path or None on failure."""
             file_name = file.get('fileName', 'unknown_file')
             file_id = file.get('ID')
             if not file_id:
                 logger.warning(f"Skipping file with no ID: {file_name}")
-                continue
-            
+                return None
+
             # Quote the file_id for OData string key
             file_url = f"{EMBEDDING_API_BASE_URL}('{file_id}')/content"
             logger.info(f"Downloading file: {file_name} from {file_url}")
-            file_response = requests.get(file_url, headers=headers)
-            
+            file_response = http_session.get(file_url, headers=headers, stream=True)
+
             if file_response.status_code != 200:
                 logger.error(f"Failed to download {file_name}: Status {file_response.status_code}, Response: {file_response.text}")
-                continue
-            
-            file_content = file_response.content
-            
-            # Save all files to documents_dir
+                file_response.close()
+                return None
+
+            # Save all files to documents_dir, streaming in chunks so large
+            # PDFs/decks are not held fully in memory before the first write
             file_path = os.path.join(documents_dir, file_name)
             with open(file_path, 'wb') as f:
-                f.write(file_content)
+                for chunk in file_response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
             logger.info(f"Downloaded: {file_path}")
-            successful_downloads += 1
-            downloaded_file_paths.append(file_path)
-            
+
             # Move image files to images_dir
             file_extension = os.path.splitext(file_name)[1].lower()
             if file_extension in image_extensions:
                 image_path = os.path.join(images_dir, file_name)
                 shutil.move(file_path, image_path)
                 logger.info(f"Moved to Images: {image_path}")
-        
+            return file_path
+
+        # Download files in parallel over the pooled session so transfers
+        # overlap instead of paying each round trip back to back
+        with ThreadPoolExecutor(max_workers=min(8, total_files)) as executor:
+            futures = [executor.submit(download_one, file) for file in files]
+            for future in as_completed(futures):
+                try:
+                    file_path = future.result()
+                except Exception as e:
+                    logger.error(f"Download worker failed: {str(e)}")
+                    continue
+                if file_path:
+                    downloaded_file_paths.append(file_path)
+
+        successful_downloads = len(downloaded_file_paths)
         if successful_downloads == 0 and total_files > 0:
             logger.error("No files were downloaded successfully")
             return []
@@ -293,8 +442,9 @@ def update_completed_files(documents_dir: str, images_dir: str, allowed_extensio
             files = [f for f in os.listdir(directory) if os.path.splitext(f)[1].lower() in allowed_extensions]
             logger.info(f"Found {len(files)} files in {directory} to update status")
             for filename in files:
-                if filename in file_mappings:
-                    file_id = file_mappings[filename]
+                # Single lookup instead of a membership test plus an index
+                file_id = file_mappings.get(filename)
+                if file_id:
                     logger.info(f"Updating status for {filename} (ID: {file_id})")
                     if update_file_status(file_id, "Completed"):
                         success_count += 1
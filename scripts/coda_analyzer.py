@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+from functools import lru_cache
 from gen_ai_hub.proxy.native.amazon.clients import Session
 
 load_dotenv()
@@ -7,14 +8,20 @@ load_dotenv()
 localpath = os.getenv('LOCALPATH', os.getcwd())
 filepath = os.path.join(localpath, "prompt_CODA.txt")
 
+
+@lru_cache(maxsize=1)
+def _load_coda_method():
+    """Read the CODA method text once; it never changes while the app runs."""
+    filename = os.path.abspath(filepath)
+    with open(filename, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
 def generate_coda_prompt(input_text):
     """Generate a CODA analysis prompt from a template."""
-    
-    filename = os.path.abspath(filepath)
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            coda_text = file.read()
+        coda_text = _load_coda_method()
         combined_text = "Analyse the prompt using the method and come up with clear steps to analyse and data needed to perform the analysis. <method> " + coda_text + "</method>" + "<prompt> " + input_text + "</prompt> "
         return combined_text
     except Exception as e:
-        raise Exception(f"An error occurred: {str(e)}")
\ No newline at end of file
+        raise Exception(f"An error occurred: {str(e)}")
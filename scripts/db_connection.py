@@ -1,5 +1,4 @@
 import os
-import json
 import threading
 import logging
 from gen_ai_hub.proxy.core import proxy_clients
@@ -21,7 +20,7 @@ HANA_CREDENTIALS = None  # Will hold the full credentials dict
 ORCHESTRATION_SERVICE_URL = os.environ.get('ORCHESTRATION_SERVICE_URL')   
 
 # --- HANA CREDENTIALS FROM DESTINATION SERVICES ---
-from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details, extract_hana_credentials, extract_aicore_credentials
+from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details, extract_hana_credentials, extract_aicore_credentials, token_endpoint
 
 # Load VCAP_SERVICES from environment (Cloud Foundry service bindings)
 vcap_services = os.environ.get("VCAP_SERVICES")
@@ -37,7 +36,7 @@ logger.info(f"Destination Service Credentials: {destination_service_credentials}
 # Generate OAuth token for destination service using client credentials
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -64,8 +63,30 @@ if oauth_token:
 else:
     logger.warning("OAuth token not available; HANA credentials or AIC Credentials not initialized.")
 
+# Credentials are fixed once extracted above, so validate the field set a
+# single time here instead of re-scanning the dict on every connection attempt
+HANA_CREDENTIALS_VALID = bool(
+    HANA_CREDENTIALS
+    and all(HANA_CREDENTIALS.get(k) for k in ('address', 'user', 'password', 'port', 'schema'))
+    and HANA_CREDENTIALS['address'] != 'default-hana-host'
+)
+if not HANA_CREDENTIALS_VALID:
+    logger.warning("HANA credentials incomplete; database connections will be skipped")
+
+# Column layout shared by every HanaDB vector store in this app; built once
+# and splatted into each construction instead of repeating the literals
+HANA_VECTOR_COLUMNS = {
+    "content_column": "VEC_TEXT",
+    "metadata_column": "VEC_META",
+    "vector_column": "VEC_VECTOR"
+}
+
 # Custom Connection Pool Implementation
 class ConnectionPool:
+    # Fixed attribute set; __slots__ drops the per-instance __dict__ and makes
+    # the frequent pool/lock attribute reads direct offset loads
+    __slots__ = ('max_connections', 'pool', 'lock')
+
     def __init__(self, max_connections=20):
         self.max_connections = max_connections
         self.pool = []
@@ -97,13 +118,14 @@ class ConnectionPool:
     def _create_connection(self):
         """Create a new database connection."""
         try:
-            # Use HANA_CREDENTIALS dictionary directly
-            if not HANA_CREDENTIALS or not all([HANA_CREDENTIALS.get(k) for k in ['address', 'user', 'password', 'port', 'schema']]) or HANA_CREDENTIALS['address'] == 'default-hana-host':
+            # Validity was established once at import time
+            if not HANA_CREDENTIALS_VALID:
                 logger.warning("HANA credentials not properly initialized; skipping connection creation")
                 return None
             conn = dbapi.connect(
                 address=HANA_CREDENTIALS['address'],
-                port=int(HANA_CREDENTIALS['port']),
+                # Port is already an int: extract_hana_credentials converts it once
+                port=HANA_CREDENTIALS['port'],
                 user=HANA_CREDENTIALS['user'],
                 password=HANA_CREDENTIALS['password']
             )
@@ -147,6 +169,33 @@ def close_all_db_connections():
     logger.info("Closing all database connections in the pool")
     connection_pool.close_all_connections()
 
+# Embedding model is expensive to construct (proxy client auth + deployment
+# discovery), so build it once on first use and reuse it across calls
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+def _get_embedding_model(AIC_CREDENTIALS):
+    """Return the shared embedding model, constructing it on first call."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                #SOC: SRIRAM 26.05.25
+                from gen_ai_hub.proxy.langchain.init_models import init_embedding_model
+                from gen_ai_hub.proxy import GenAIHubProxyClient
+
+                proxy_client = GenAIHubProxyClient(
+                                                base_url = AIC_CREDENTIALS['aic_base_url'],
+                                                auth_url = AIC_CREDENTIALS['aic_auth_url'],
+                                                client_id = AIC_CREDENTIALS['clientid'],
+                                                client_secret = AIC_CREDENTIALS['clientsecret'],
+                                                resource_group = AIC_CREDENTIALS['resource_group']
+                                                )
+                _embedding_model = init_embedding_model(model_name = EMBEDDING_MODEL, proxy_client=proxy_client)
+                logger.info(proxy_client.deployments)
+                #EOC: SRIRAM
+    return _embedding_model
+
 def load_vector_stores(bank_name: str = None, AIC_CREDENTIALS = None):
     """Initialize transcript and non-transcript vector stores, including Excel non-transcripts, optionally filtered by bank name."""
     logger.info(f"Loading vector stores with bank_name filter: {bank_name if bank_name else 'None'}")
@@ -155,23 +204,9 @@ def load_vector_stores(bank_name: str = None, AIC_CREDENTIALS = None):
     try:
         # Initialize embedding model with ORCHESTRATION_SERVICE_URL
         try:
-            logger.info('Embedding Model', EMBEDDING_MODEL)
-            logger.info('AIC Credentials', AIC_CREDENTIALS)
-            #SOC: SRIRAM 26.05.25
-            from gen_ai_hub.proxy.langchain.init_models import init_embedding_model
-            from gen_ai_hub.proxy import GenAIHubProxyClient
-
-            proxy_client = GenAIHubProxyClient(
-                                            base_url = AIC_CREDENTIALS['aic_base_url'],
-                                            auth_url = AIC_CREDENTIALS['aic_auth_url'],
-                                            client_id = AIC_CREDENTIALS['clientid'],
-                                            client_secret = AIC_CREDENTIALS['clientsecret'],
-                                            resource_group = AIC_CREDENTIALS['resource_group']
-                                            )
-            embedding_model = init_embedding_model(model_name = EMBEDDING_MODEL, proxy_client=proxy_client)
-            logger.info(proxy_client.deployments)
-            #EOC: SRIRAM
-            
+            logger.info(f"Embedding Model: {EMBEDDING_MODEL}")
+            logger.info(f"AIC Credentials: {AIC_CREDENTIALS}")
+            embedding_model = _get_embedding_model(AIC_CREDENTIALS)
             logger.info("Embedding model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {str(e)}")
@@ -194,25 +229,19 @@ def load_vector_stores(bank_name: str = None, AIC_CREDENTIALS = None):
                 connection=conn,
                 embedding=embedding_model,
                 table_name=transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             non_transcript_store = HanaDB(
                 connection=conn,
                 embedding=embedding_model,
                 table_name=non_transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             excel_non_transcript_store = HanaDB(
                 connection=conn,
                 embedding=embedding_model,
                 table_name=excel_non_transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             logger.info("Vector stores initialized successfully")
         except Exception as e:
@@ -1,65 +1,159 @@
-import logging
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import os
+import time
+import hashlib
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Set up logger
-logger = logging.getLogger('EarningsAnalysis')
-logger.setLevel(logging.INFO)
+from logger_setup import get_logger
+logger = get_logger()
+
+# Pool sizing is env-configurable: under concurrent load (thread-pool query
+# processing, parallel downloads) the urllib3 default of 10 connections per
+# host causes queuing, so the ceiling can be raised without a code change
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+
+# Shared HTTP session with a pooled adapter so repeated token and destination
+# lookups reuse keep-alive TLS connections instead of re-handshaking each call.
+# Transient auth/destination-server failures are retried in-adapter with
+# exponential backoff instead of surfacing immediately to the caller.
+http_session = requests.Session()
+_pooled_adapter = HTTPAdapter(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    pool_block=False,
+    max_retries=Retry(
+        total=3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        backoff_factor=0.5,
+        # Randomized jitter (urllib3>=2.0) so many instances throttled at the
+        # same time don't retry in lockstep against the shared backend
+        backoff_jitter=0.5,
+        respect_retry_after_header=True,
+        allowed_methods=['GET', 'POST'],
+        # Hand the final response back so raise_for_status() still raises the
+        # HTTPError the callers' 500-handling expects
+        raise_on_status=False
+    )
+)
+# One adapter for both schemes so every module importing http_session shares
+# a single connection pool regardless of how a destination URL is configured
+http_session.mount('https://', _pooled_adapter)
+http_session.mount('http://', _pooled_adapter)
 
 
 
 # Step 1: Load environment variables from CF VCAP_SERVICES
+@lru_cache(maxsize=1)
 def get_destination_service_credentials(vcap_services):
 # Function common to both local and cloud environments
 # Function to extract destination service credentials from VCAP_SERVICES
-    vcap_services = json.loads(vcap_services)
+# Half a dozen modules call this at import with the same VCAP_SERVICES value,
+# so the parse and validation run once and the rest get the cached dict
+    if not vcap_services:
+        raise ValueError("VCAP_SERVICES not found in environment.")
+    # VCAP_SERVICES can run to many KB with several bound services; orjson
+    # parses it in one C-level pass like the response bodies below
+    vcap_services = orjson.loads(vcap_services)
     if not isinstance(vcap_services, dict):
         raise ValueError("VCAP_SERVICES could not be loaded as a dictionary.")
     # Directly access the 'destination' service
     destination_services = vcap_services.get('destination')
-    if destination_services and isinstance(destination_services, list) and len(destination_services) > 0:
-        creds = destination_services[0].get('credentials', {})
-        if all([creds.get('url'), creds.get('clientid'), creds.get('clientsecret'), creds.get('uri')]):
-            return {
-                'dest_auth_url': creds['url'],
-                'clientid': creds['clientid'],
-                'clientsecret': creds['clientsecret'],
-                'dest_base_url': creds['uri']
-            }
-    else:
-        logger.info("VCAP_SERVICES not found in environment")
-        return None
+    if not destination_services or not isinstance(destination_services, list):
+        raise ValueError("No 'destination' service binding found in VCAP_SERVICES.")
+    creds = destination_services[0].get('credentials', {})
+    # Validate all required fields upfront so callers fail with a clear
+    # message here instead of a TypeError on a None return later
+    missing = [k for k in ('url', 'clientid', 'clientsecret', 'uri') if not creds.get(k)]
+    if missing:
+        raise ValueError(f"Missing destination service credentials in VCAP_SERVICES: {', '.join(missing)}")
+    return {
+        'dest_auth_url': creds['url'],
+        'clientid': creds['clientid'],
+        'clientsecret': creds['clientsecret'],
+        'dest_base_url': creds['uri']
+    }
+
+
+def token_endpoint(auth_url):
+    """Build the OAuth token endpoint from an auth server base URL.
+
+    Strips once and only appends the suffix when missing, so a base URL
+    configured with a trailing slash (or already pointing at the token
+    endpoint) doesn't produce a malformed double path.
+    """
+    auth_url = auth_url.rstrip('/')
+    return auth_url if auth_url.endswith('/oauth/token') else auth_url + '/oauth/token'
+
+
+# Token cache keyed per credential set, so the several modules that all call
+# generate_token with the same client at import time share one token fetch
+_token_cache = {}
+_token_cache_lock = threading.Lock()
+TOKEN_CACHE_MAX_ENTRIES = 64
+TOKEN_CACHE_MARGIN = 300  # seconds subtracted from expires_in before reuse stops
 
+@lru_cache(maxsize=TOKEN_CACHE_MAX_ENTRIES)
+def _secret_digest(client_secret):
+    """Digest of a client secret for cache keying, hashed once per secret."""
+    return hashlib.sha256(client_secret.encode()).hexdigest()
 
 # Step 2: Generate Token for Destination Services
 def generate_token(uri, client_id, client_secret):
-    response = requests.post(uri, data={'grant_type': 'client_credentials'}, auth=(client_id, client_secret))
+    cache_key = (uri, client_id, _secret_digest(client_secret))
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+        if cached and cached[1] > now:
+            logger.info("Reusing cached OAuth token.")
+            return cached[0]
+    response = http_session.post(uri, data={'grant_type': 'client_credentials'}, auth=(client_id, client_secret))
     response.raise_for_status()
+    payload = orjson.loads(response.content)
+    token = payload['access_token']
+    try:
+        lifetime = float(payload.get('expires_in'))
+    except (TypeError, ValueError):
+        lifetime = 3600.0
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry to keep the cache bounded
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[cache_key] = (token, now + max(lifetime - TOKEN_CACHE_MARGIN, 60.0))
     logger.info("OAuth token generated successfully.")
-    # logger.info(f"Token: {response.json()['access_token']}")
-    return response.json()['access_token']
+    # logger.info(f"Token: {token}")
+    return token
 
 # Step 3: Get Hana DataBase Details by passing Service Name
 def fetch_destination_details(uri, name, token):
     url = f"{uri}/destination-configuration/v1/destinations/{name}"
     headers = {'Authorization': f'Bearer {token}'}
-    response = requests.get(url, headers=headers)
+    response = http_session.get(url, headers=headers)
     # response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
 
 # Step 4: Extract HANA connection details
 def extract_hana_credentials(config):
     dc = config.get('destinationConfiguration', {})
     url = dc.get('URL', '')
-    # Remove http:// or https:// if present
-    address = url.replace("https://", "").replace("http://", "")
+    # Remove http:// or https:// if present (single pass instead of two replace scans)
+    address = url.split('://', 1)[-1]
+    # Convert the port once here so every consumer gets an int instead of
+    # re-parsing the destination's string value per connection
+    port = dc.get('Port')
+    if port is not None:
+        port = int(port)
     return {
         'address': address,
         'user': dc.get('User'),
         'password': dc.get('Password'),
-        'port': dc.get('Port'),
+        'port': port,
         'schema': dc.get('schema')  # <-- This is where the schema is extracted and set in HANA_CREDENTIALS
     }
 
@@ -1,15 +1,17 @@
-from db_connection import get_db_connection, release_db_connection
+from db_connection import get_db_connection, release_db_connection, HANA_VECTOR_COLUMNS
 from langchain_community.vectorstores import HanaDB
 from gen_ai_hub.proxy.langchain.init_models import init_embedding_model
 from logger_setup import get_logger
 import os
 import hashlib
+import logging
+import threading
 from pdf_processor import process_all_pdfs, process_pdf_with_embeddings
 from excel_processor import process_all_excel
 from concurrent.futures import ThreadPoolExecutor
 from env_config import TABLE_NAMES, EMBEDDING_MODEL
-from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details, extract_aicore_credentials
-import json
+from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details, extract_aicore_credentials, token_endpoint
+import orjson
 import requests
 
 logger = get_logger()
@@ -22,7 +24,7 @@ destination_service_credentials = get_destination_service_credentials(vcap_servi
 
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -40,7 +42,30 @@ aicore_details = fetch_destination_details(
     oauth_token
 )
 AIC_CREDENTIALS = extract_aicore_credentials(aicore_details)
-logger.info("AIC Credential", AIC_CREDENTIALS)
+logger.info(f"AIC Credential: {AIC_CREDENTIALS}")
+
+# Embedding model (and its proxy client) built once on first use; every
+# process_and_store_embeddings run previously re-authenticated and
+# re-resolved the deployment with identical credentials
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+def _get_embedding_model():
+    """Return the shared embedding model, constructing it on first call."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from gen_ai_hub.proxy import GenAIHubProxyClient
+                proxy_client = GenAIHubProxyClient(
+                    base_url=AIC_CREDENTIALS['aic_base_url'],
+                    auth_url=AIC_CREDENTIALS['aic_auth_url'],
+                    client_id=AIC_CREDENTIALS['clientid'],
+                    client_secret=AIC_CREDENTIALS['clientsecret'],
+                    resource_group=AIC_CREDENTIALS['resource_group']
+                )
+                _embedding_model = init_embedding_model(model_name=EMBEDDING_MODEL, proxy_client=proxy_client)
+    return _embedding_model
 
 def get_existing_file_info_from_db():
     """Retrieve unique file info from three HANA tables."""
@@ -82,14 +107,34 @@ def get_existing_file_info_from_db():
         if conn:
             release_db_connection(conn)
 
+# Hash results keyed by (path, size, mtime): a file that hasn't changed since
+# the last run skips the full MD5 read and costs one stat call instead.
+# Writes are locked because processing tasks run in a thread pool, and the
+# cache is bounded so re-uploaded files don't grow it without limit
+_hash_cache = {}
+_hash_cache_lock = threading.Lock()
+HASH_CACHE_MAX_ENTRIES = 1024
+
 def compute_file_hash(file_path):
-    """Calculate MD5 hash of a file's content."""
+    """Calculate MD5 hash of a file's content, cached while the file is unchanged."""
+    stat = os.stat(file_path)
+    cache_key = (file_path, stat.st_size, stat.st_mtime)
+    try:
+        # EAFP: hits skip the membership test and second lookup
+        return _hash_cache[cache_key]
+    except KeyError:
+        pass
     logger.debug(f"Computing hash for file: {file_path}")
     hash_md5 = hashlib.md5()
     with open(file_path, "rb") as f:
         for chunk in iter(lambda: f.read(4096), b""):
             hash_md5.update(chunk)
     file_hash = hash_md5.hexdigest()
+    with _hash_cache_lock:
+        if len(_hash_cache) >= HASH_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry to keep the cache bounded
+            _hash_cache.pop(next(iter(_hash_cache)))
+        _hash_cache[cache_key] = file_hash
     logger.debug(f"Hash computed: {file_hash}")
     return file_hash
 
@@ -103,6 +148,11 @@ def store_embeddings(vector_store, texts, embeddings, metadatas):
         content_hash = meta.get("content_hash", "unknown")
         page = meta.get("page", 0)
 
+        # Fast path: our own processors already emit correctly typed metadata,
+        # so skip the per-field conversion checks when nothing needs fixing
+        if isinstance(source_file, str) and isinstance(content_hash, str) and isinstance(page, int):
+            return {"source_file": source_file, "content_hash": content_hash, "page": page}
+
         if not isinstance(source_file, str):
             logger.error(f"source_file is not a string, converting: {source_file} (type: {type(source_file)})")
             source_file = str(source_file)
@@ -130,14 +180,20 @@ def store_embeddings(vector_store, texts, embeddings, metadatas):
     filtered_metadatas = []
     filtered_texts = []
     filtered_embeddings = []
-    
-    for i, meta in enumerate(metadatas):
+
+    # Per-row debug formatting renders whole metadata dicts; only pay for it
+    # when debug output is actually enabled
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    # Single zip pass instead of indexing texts/embeddings per row
+    for i, (text, embedding, meta) in enumerate(zip(texts, embeddings, metadatas)):
         try:
-            logger.debug(f"Processing metadata at index {i}: {meta}")
+            if debug_enabled:
+                logger.debug(f"Processing metadata at index {i}: {meta}")
             clean_meta = validate_metadata(meta)
             filtered_metadatas.append(clean_meta)
-            filtered_texts.append(texts[i])
-            filtered_embeddings.append(embeddings[i])
+            filtered_texts.append(text)
+            filtered_embeddings.append(embedding)
         except Exception as e:
             logger.error(f"Skipping metadata at index {i} due to validation error: {e}. Metadata: {meta}")
             continue
@@ -148,9 +204,10 @@ def store_embeddings(vector_store, texts, embeddings, metadatas):
     
     try:
         logger.info(f"About to store {len(filtered_embeddings)} embeddings in {vector_store.table_name}")
-        logger.debug(f"Sample text: {filtered_texts[0] if filtered_texts else 'None'}")
-        logger.debug(f"Sample metadata: {filtered_metadatas[0] if filtered_metadatas else 'None'}")
-        logger.debug(f"Sample embedding shape: {len(filtered_embeddings[0]) if filtered_embeddings else 'None'}")
+        if debug_enabled:
+            logger.debug(f"Sample text: {filtered_texts[0] if filtered_texts else 'None'}")
+            logger.debug(f"Sample metadata: {filtered_metadatas[0] if filtered_metadatas else 'None'}")
+            logger.debug(f"Sample embedding shape: {len(filtered_embeddings[0]) if filtered_embeddings else 'None'}")
         
         # CRITICAL FIX: Convert embeddings to proper format if needed
         processed_embeddings = []
@@ -256,8 +313,9 @@ def remove_duplicates(table_name):
         INSERT INTO {table_name} (VEC_TEXT, VEC_VECTOR, VEC_META)
         VALUES (?, ?, ?)
         """
-        for vec_text, vec_vector, vec_meta in unique_records.values():
-            cursor.execute(insert_query, (vec_text, vec_vector, vec_meta))
+        # One executemany round instead of a Python-level execute per record:
+        # hdbcli batches the parameter sets in a single C-level call
+        cursor.executemany(insert_query, list(unique_records.values()))
         
         records_removed = len(all_records) - len(unique_records)
         conn.commit()
@@ -351,18 +409,7 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
     # Step 9.3: Initialize embedding model
     logger.info("EmbStorer: 9.3 - Initializing embedding model")
     try:
-        from gen_ai_hub.proxy import GenAIHubProxyClient
-        logger.info(f"AIC Credentials: {json.dumps(AIC_CREDENTIALS)}")
-
-        proxy_client = GenAIHubProxyClient(
-            base_url=AIC_CREDENTIALS['aic_base_url'],
-            auth_url=AIC_CREDENTIALS['aic_auth_url'],
-            client_id=AIC_CREDENTIALS['clientid'],
-            client_secret=AIC_CREDENTIALS['clientsecret'],
-            resource_group=AIC_CREDENTIALS['resource_group']
-        )
-
-        embedding_model = init_embedding_model(model_name=EMBEDDING_MODEL, proxy_client=proxy_client)
+        embedding_model = _get_embedding_model()
         logger.info("Embedding model initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize embedding model: {e}")
@@ -398,7 +445,9 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
                 print(f"  ERROR processing {pdf}: {str(e)}")
                 return None, is_transcript
 
-        pdf_files = [f for f in os.listdir(directory_path) if f.lower().endswith('.pdf') and f in pdf_files_to_process]
+        # The directory was already listed and categorized above; filter the
+        # cached listing instead of re-walking the directory
+        pdf_files = [f for f in files_in_dir if f in pdf_files_to_process]
         if not pdf_files:
             print(f"No PDFs in {directory_path} to process")
             return [], []
@@ -461,15 +510,17 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
         logger.error("EmbStorer: ERROR - Database connection failed. Embedding process will not continue. This is a critical error that prevents reaching Step 10 in server.py.")
         return
     
+    # Step log lives here, not in clean_metadata: the helper runs once per
+    # embedding row and was emitting an identical info line for each one
+    logger.info("EmbStorer: 9.26 - Cleaning metadata")
+
     def clean_metadata(meta, file_hash_dict):
         """Clean metadata to ensure proper format"""
-        logger.info("EmbStorer: 9.26 - Cleaning metadata")
         cleaned = dict(meta)
         sf = cleaned.get("source_file")
         if isinstance(sf, dict):
-            logger.error("Fixing source_file metadata from dict to string")
             logger.error(f"Fixing source_file metadata from dict to string: {sf}")
-            cleaned["source_file"] = json.dumps(sf)
+            cleaned["source_file"] = orjson.dumps(sf).decode()
         elif not isinstance(sf, str):
             cleaned["source_file"] = str(sf)
         
@@ -486,9 +537,7 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
                 connection=conn,
                 embedding=embedding_model,
                 table_name=pdf_transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             
             # Delete existing embeddings for files being reprocessed
@@ -515,9 +564,7 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
                 connection=conn,
                 embedding=embedding_model,
                 table_name=pdf_non_transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             
             # Delete existing embeddings for files being reprocessed
@@ -544,9 +591,7 @@ def process_and_store_embeddings(directory_path, force_overwrite_files=None, mod
                 connection=conn,
                 embedding=embedding_model,
                 table_name=excel_non_transcript_table,
-                content_column="VEC_TEXT",
-                metadata_column="VEC_META",
-                vector_column="VEC_VECTOR"
+                **HANA_VECTOR_COLUMNS
             )
             
             # Delete existing embeddings for files being reprocessed
@@ -1,5 +1,6 @@
 import os
-import json
+import orjson
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Table names for HANA DB
@@ -42,18 +43,52 @@ KNOWN_BANKS_JSON = '''
 # Supported image extensions
 IMAGE_EXTENSIONS = ["jpeg", "png"]
 
+@lru_cache(maxsize=1)
 def get_known_banks() -> dict:
     """
     Load and parse the KNOWN_BANKS_JSON into a dictionary.
-    
+    The constant never changes at runtime, so the parsed result is cached
+    and repeat callers get a dict lookup instead of a JSON parse.
+
     Returns:
         dict: Dictionary with bank codes as keys and names as values.
     """
     try:
-        return json.loads(KNOWN_BANKS_JSON)
-    except json.JSONDecodeError as e:
+        return orjson.loads(KNOWN_BANKS_JSON)
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Failed to parse KNOWN_BANKS_JSON: {str(e)}")
 
+@lru_cache(maxsize=1)
+def get_known_banks_lower() -> tuple:
+    """
+    Known banks as (code, code_lower, name_lower) tuples.
+    Precomputed once so matching loops compare against ready-lowered
+    strings instead of re-lowering every bank per lookup.
+
+    Returns:
+        tuple: Tuples of (code, lowercased code, lowercased name).
+    """
+    return tuple(
+        (code, code.lower(), name.lower())
+        for code, name in get_known_banks().items()
+    )
+
+@lru_cache(maxsize=1)
+def get_bank_code_lookup() -> dict:
+    """
+    Flat lowercased-name/code -> bank-code mapping for exact matches.
+    Resolving a bank this way is one dict lookup instead of scanning the
+    bank tuples; fuzzy (substring) matching still walks the tuples.
+
+    Returns:
+        dict: Keys are lowercased bank names and codes, values are bank codes.
+    """
+    banks = get_known_banks_lower()
+    # Codes first, then names, so a name match wins if a string is both
+    lookup = {code_lower: code for code, code_lower, _ in banks}
+    lookup.update({name_lower: code for code, _, name_lower in banks})
+    return lookup
+
 def load_config():
     """Load environment variables from .env file."""
     load_dotenv()
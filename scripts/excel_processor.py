@@ -1,5 +1,6 @@
 import os
 import time
+import threading
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from gen_ai_hub.proxy.langchain.init_models import init_embedding_model
@@ -13,13 +14,26 @@ from env_config import  EMBEDDING_MODEL
 logger = get_logger()
 load_dotenv()
 
+# Pre-compiled patterns for clean_text, so per-sheet calls skip regex compilation
+RE_JPMORGAN = re.compile(r"JPHORGAN", re.IGNORECASE)
+RE_EXCEPT = re.compile(r"excape", re.IGNORECASE)
+RE_WHITESPACE = re.compile(r"\s+")
+
+# Splitter settings never change, so one stateless instance is shared across
+# process_excel calls instead of constructing a new one per run
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=10000,
+    chunk_overlap=400,
+    length_function=len
+)
+
 def clean_text(text):
     """Clean OCR artifacts and normalize text."""
     if not text:
         return ""
-    text = re.sub(r"JPHORGAN", "JPMORGAN", text, flags=re.IGNORECASE)
-    text = re.sub(r"excape", "except", text, flags=re.IGNORECASE)
-    text = re.sub(r"\s+", " ", text).strip()  # Normalize whitespace
+    text = RE_JPMORGAN.sub("JPMORGAN", text)
+    text = RE_EXCEPT.sub("except", text)
+    text = RE_WHITESPACE.sub(" ", text).strip()  # Normalize whitespace
     return text
 
 def process_single_excel(file_path, filename):
@@ -30,18 +44,21 @@ def process_single_excel(file_path, filename):
         wb = load_workbook(file_path, data_only=True)
         for sheet_name in wb.sheetnames:
             ws = wb[sheet_name]
-            text_content = ""
+            # Collect rows in a list and join once: += on a string copies the
+            # accumulated sheet text on every row, which is quadratic on the
+            # large sheets these workbooks contain
+            row_lines = []
             for row in ws.rows:
-                row_text = " ".join([str(cell.value or "").strip() for cell in row if cell.value is not None])
+                row_text = " ".join(str(cell.value or "").strip() for cell in row if cell.value is not None)
                 if row_text:
-                    text_content += row_text + "\n"
-            if text_content:
+                    row_lines.append(row_text)
+            if row_lines:
                 metadata = {
                     "source_file": filename,
                     "sheet": sheet_name,
                     "type": "excel"
                 }
-                excel_docs.append(Document(page_content=clean_text(text_content.strip()), metadata=metadata))
+                excel_docs.append(Document(page_content=clean_text("\n".join(row_lines)), metadata=metadata))
     except Exception as e:
         logger.error(f"Error processing {filename}: {e}")
     return excel_docs
@@ -57,6 +74,22 @@ def save_extracted_data(excel_docs: list[Document], output_dir: str):
             f.write("-" * 80 + "\n")
     logger.info(f"Saved extracted Excel data to {txt_path}")
 
+# Embedding models cached per model name: initialization resolves the proxy
+# deployment every time, which is identical across create_embeddings calls
+_embedding_models = {}
+_embedding_models_lock = threading.Lock()
+
+def _get_embedding_model(model_name):
+    """Return the shared embedding model for a name, constructing it once."""
+    model = _embedding_models.get(model_name)
+    if model is None:
+        with _embedding_models_lock:
+            model = _embedding_models.get(model_name)
+            if model is None:
+                model = init_embedding_model(model_name)
+                _embedding_models[model_name] = model
+    return model
+
 def create_embeddings(docs, model_name=EMBEDDING_MODEL, batch_size=400):
     """Generate embeddings for document chunks in batches."""
     if not docs:
@@ -64,7 +97,7 @@ def create_embeddings(docs, model_name=EMBEDDING_MODEL, batch_size=400):
         return [], 1
     logger.info(f"Creating embeddings for {len(docs)} docs with {model_name}")
     try:
-        embedding_model = init_embedding_model(model_name)
+        embedding_model = _get_embedding_model(model_name)
         logger.info(f"Embedding model initialized: {embedding_model}")
         results = []
         for i in range(0, len(docs), batch_size):
@@ -117,12 +150,7 @@ def process_excel(excel_dir):
     # Save extracted data as text file
     #save_extracted_data(all_excel_docs, excel_dir)
     # Split into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=10000,
-        chunk_overlap=400,
-        length_function=len
-    )
-    chunks = text_splitter.split_documents(all_excel_docs)
+    chunks = TEXT_SPLITTER.split_documents(all_excel_docs)
     if not chunks:
         logger.warning(f"No chunks created from Excel files")
         return []
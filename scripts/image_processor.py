@@ -3,19 +3,43 @@ from gen_ai_hub.proxy.native.amazon.clients import Session
 from botocore.exceptions import ClientError
 from pathlib import Path
 import logging
-from env_config import MODEL_ID, IMAGE_EXTENSIONS, get_known_banks
+from env_config import MODEL_ID, IMAGE_EXTENSIONS, get_known_banks, get_known_banks_lower, get_bank_code_lookup
 import tenacity
 from typing import List, Dict
 import re
 import os
+import datetime
+import threading
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, 
+logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Default analysis prompt is constant; defined once instead of per call
+DEFAULT_IMAGE_PROMPT = """    Summarize the details with meaningful insights in a concise paragraph format:
+    Include Stock Price movement in Percentage with closing stock price and timestamp.
+    Stock Insights by identifying meaningful Key phases along with timestamp.
+    Concisely explain these key phases with all indicators (price, volume, On Balance Volume, Money Flow Index) and numbers
+
+    """
+
+# Bedrock client is built lazily on first use and reused: constructing it
+# runs the proxy's deployment lookup, which is identical for every call
+_bedrock_client = None
+_bedrock_client_lock = threading.Lock()
+
+def _get_bedrock_client():
+    """Create the Bedrock runtime client on first use and reuse it after."""
+    global _bedrock_client
+    if _bedrock_client is None:
+        with _bedrock_client_lock:
+            if _bedrock_client is None:
+                _bedrock_client = Session().client(model_name=MODEL_ID)
+    return _bedrock_client
+
 @tenacity.retry(
     stop=tenacity.stop_after_attempt(3),
     wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
@@ -106,18 +130,15 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
     Returns:
         List[Dict[str, str]]: A list of dictionaries, each containing the image path and its analysis.
     """
-    # Define default prompt
-    default_prompt = """    Summarize the details with meaningful insights in a concise paragraph format:
-    Include Stock Price movement in Percentage with closing stock price and timestamp.
-    Stock Insights by identifying meaningful Key phases along with timestamp.
-    Concisely explain these key phases with all indicators (price, volume, On Balance Volume, Money Flow Index) and numbers 
-    
-    """
-    
-    # Combine prompts
-    combined_prompt = default_prompt
-    if user_prompt.strip():
-        combined_prompt += "\n" + user_prompt.strip()
+    # Combine prompts; strip once and skip the concat when there is no user text
+    user_prompt_clean = user_prompt.strip()
+    if user_prompt_clean:
+        combined_prompt = DEFAULT_IMAGE_PROMPT + "\n" + user_prompt_clean
+    else:
+        combined_prompt = DEFAULT_IMAGE_PROMPT
+
+    # Current two-digit year, computed once for all quarter fallbacks below
+    current_year = str(datetime.datetime.now().year)[-2:]
 
     # Validate folder
     folder = Path(folder_path)
@@ -141,7 +162,7 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
     # Extract bank name and quarter from user_prompt
     bank_code = None
     quarter = None
-    known_banks = get_known_banks()  # Load bank code-name dictionary
+    known_banks = get_known_banks_lower()  # Precomputed (code, code_lower, name_lower) tuples
 
     # Try structured prompt format with fix for both "Ban:" and "Bank:"
     bank_match = re.search(r'[Bb]an[k]?:\s*([^\n,]+)', user_prompt)
@@ -150,25 +171,15 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
     period_match = re.search(r'(?:[Pp]eriod|[Qq]uarter):\s*([^\n,]+)', user_prompt)
 
     if bank_match:
-        bank_name = bank_match.group(1).strip()
-        
-        # Try exact match first
-        for code, name in known_banks.items():
-            if bank_name.lower() == name.lower():
-                bank_code = code
-                break
-                
-        # If no exact match, try code match
-        if not bank_code:
-            for code, name in known_banks.items():
-                if bank_name.lower() == code.lower():
-                    bank_code = code
-                    break
-                    
+        bank_name_lower = bank_match.group(1).strip().lower()
+
+        # Exact name/code matches resolve via one precomputed dict lookup
+        bank_code = get_bank_code_lookup().get(bank_name_lower)
+
         # If still no match, try contains match
         if not bank_code:
-            for code, name in known_banks.items():
-                if bank_name.lower() in name.lower() or name.lower() in bank_name.lower():
+            for code, code_lower, name_lower in known_banks:
+                if bank_name_lower in name_lower or name_lower in bank_name_lower:
                     bank_code = code
                     break
 
@@ -198,8 +209,6 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
                 if q_match:
                     quarter_num = q_match.group(1)
                     # Default to current year if only quarter is specified
-                    import datetime
-                    current_year = str(datetime.datetime.now().year)[-2:]
                     quarter = f"{quarter_num}Q{current_year}"
 
     # Fallback to free-form prompt if structured format not found
@@ -208,11 +217,11 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
         
         # Find bank name
         if not bank_code:
-            for code, name in known_banks.items():
-                if name.lower() in prompt_lower:
+            for code, code_lower, name_lower in known_banks:
+                if name_lower in prompt_lower:
                     bank_code = code
                     break
-                elif code.lower() in prompt_lower:
+                elif code_lower in prompt_lower:
                     bank_code = code
                     break
         
@@ -254,15 +263,13 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
                         # Format like "Q1"
                         quarter_num = after_digits[0]
                         # Default to current year
-                        import datetime
-                        current_year = str(datetime.datetime.now().year)[-2:]
                         quarter = f"{quarter_num}Q{current_year}"
                         break
                     elif before_digits and len(before_digits[-1]) <= 2 and int(before_digits[-1]) <= 4:
                         # Format like "1Q"
                         quarter_num = before_digits[-1]
                         # Look for year after
-                        year = after_digits[0][-2:] if after_digits else str(datetime.datetime.now().year)[-2:]
+                        year = after_digits[0][-2:] if after_digits else current_year
                         quarter = f"{quarter_num}Q{year}"
                         break
 
@@ -293,8 +300,6 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
                         # Absolute fallback: if we have a bank but no quarter, use simple heuristics
                         for i in range(1, 5):
                             if f"q{i}" in user_prompt.lower() or f"q {i}" in user_prompt.lower():
-                                import datetime
-                                current_year = str(datetime.datetime.now().year)[-2:]
                                 quarter = f"{i}Q{current_year}"
                                 break
 
@@ -381,7 +386,7 @@ def process_images(folder_path: str, user_prompt: str = "") -> List[Dict[str, st
 
     # Process each filtered image and collect responses
     try:
-        bedrock_client = Session().client(model_name=MODEL_ID)
+        bedrock_client = _get_bedrock_client()
     except Exception as e:
         logger.error(f"Failed to create Bedrock client: {str(e)}")
         return []
@@ -1,6 +1,6 @@
 import os
-import json
 import requests
+import threading
 from dotenv import load_dotenv
 from gen_ai_hub.orchestration.models.config import OrchestrationConfig
 from gen_ai_hub.orchestration.models.llm import LLM
@@ -10,7 +10,7 @@ from gen_ai_hub.orchestration.service import OrchestrationService
 from gen_ai_hub.orchestration.models.azure_content_filter import AzureContentFilter 
 from logger_setup import get_logger
 from typing import Optional, List, Dict
-from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_aicore_credentials
+from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_aicore_credentials, token_endpoint
 
 
 # Load environment variables
@@ -35,7 +35,7 @@ logger.info(f"Destination Service Credentials: {destination_service_credentials}
 # Generate OAuth token for destination service
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -63,22 +63,34 @@ aicore_details = fetch_destination_details(
 logger.info("AIC Destination Details fetched successfully")
 # Extract AIC Details
 AIC_CREDENTIALS = extract_aicore_credentials(aicore_details)
-#**** Construct the Orchestration url client
-from gen_ai_hub.proxy import GenAIHubProxyClient
-logger.info("Orchestration URL : initialization")
-proxy_client = GenAIHubProxyClient(
-                                base_url = AIC_CREDENTIALS['aic_base_url'],
-                                auth_url = AIC_CREDENTIALS['aic_auth_url'],
-                                client_id = AIC_CREDENTIALS['clientid'],
-                                client_secret = AIC_CREDENTIALS['clientsecret'],
-                                resource_group = AIC_CREDENTIALS['resource_group']
-                                )
 ORCHESTRATION_SERVICE_URL = AIC_CREDENTIALS['ORCHESTRATION_SERVICE_URL']
 #ORCHESTRATION_SERVICE_URL = "https://api.ai.prod-ap11.ap-southeast-1.aws.ml.hana.ondemand.com/v2/inference/deployments/d53b8af17648a85c"
 print("ORCH_URL", ORCHESTRATION_SERVICE_URL)
-ORCHESTRATION_SERVICE = OrchestrationService(api_url=ORCHESTRATION_SERVICE_URL, proxy_client=proxy_client)  
 logger.info(f" AIC Credentials: {AIC_CREDENTIALS}")
 
+# Orchestration client is built lazily on first use, so importing this module
+# (e.g. for endpoints that never chat) does not pay proxy-client construction
+ORCHESTRATION_SERVICE = None
+_service_lock = threading.Lock()
+
+def get_orchestration_service():
+    """Construct the orchestration service on first use and reuse it after."""
+    global ORCHESTRATION_SERVICE
+    if ORCHESTRATION_SERVICE is None:
+        with _service_lock:
+            if ORCHESTRATION_SERVICE is None:
+                from gen_ai_hub.proxy import GenAIHubProxyClient
+                logger.info("Orchestration URL : initialization")
+                proxy_client = GenAIHubProxyClient(
+                    base_url=AIC_CREDENTIALS['aic_base_url'],
+                    auth_url=AIC_CREDENTIALS['aic_auth_url'],
+                    client_id=AIC_CREDENTIALS['clientid'],
+                    client_secret=AIC_CREDENTIALS['clientsecret'],
+                    resource_group=AIC_CREDENTIALS['resource_group']
+                )
+                ORCHESTRATION_SERVICE = OrchestrationService(api_url=ORCHESTRATION_SERVICE_URL, proxy_client=proxy_client)
+    return ORCHESTRATION_SERVICE
+
 
 # Define Azure Content Filter thresholds
 CONTENT_FILTER = AzureContentFilter(hate=6, sexual=4, self_harm=0, violence=4)
@@ -93,19 +105,26 @@ MODEL_CONFIG = LLM(
     }
 )
 
+# The template, model and filter settings never change between calls, so the
+# config (and everything the SDK derives from it at request time) is built
+# once here instead of per run_orchestration call. Per-request values are
+# passed separately via TemplateValue, so sharing the config is safe.
+ORCHESTRATION_TEMPLATE = Template(messages=[UserMessage("{{ ?extraction_prompt }}")])
+ORCHESTRATION_CONFIG = OrchestrationConfig(template=ORCHESTRATION_TEMPLATE, llm=MODEL_CONFIG)
+ORCHESTRATION_CONFIG.input_filter = CONTENT_FILTER
+ORCHESTRATION_CONFIG.output_filter = CONTENT_FILTER
+
 def run_orchestration(prompt, error_context="orchestration"):
     """Run orchestration service with content filtering."""
     try:
-        if ORCHESTRATION_SERVICE is None:
+        orchestration_service = get_orchestration_service()
+        if orchestration_service is None:
             raise ValueError("OrchestrationService not initialized")
-        
-        template = Template(messages=[UserMessage("{{ ?extraction_prompt }}")])
-        config = OrchestrationConfig(template=template, llm=MODEL_CONFIG)
-        config.input_filter = CONTENT_FILTER
-        config.output_filter = CONTENT_FILTER
-        
+
+        config = ORCHESTRATION_CONFIG
+
         logger.debug(f"Running {error_context} with prompt: {prompt[:100]}...")
-        response = ORCHESTRATION_SERVICE.run(
+        response = orchestration_service.run(
             config=config,
             template_values=[TemplateValue("extraction_prompt", prompt)]
         )
@@ -136,9 +155,9 @@ def extract_analysis_steps(coda_result):
     prompt = f"<prompt> extract STRICTLY the required analysis and data requirements portion of the following text </prompt> <text> {coda_result} </text>"
     return run_orchestration(prompt, error_context="analysis steps extraction")
 
-def extract_topics(transcript_text: str) -> str:
-    """Extract top 5 topics with weights and keywords in HTML format."""
-    prompt = f"""<prompt> You are tasked with extracting the top 5 topics discussed in the provided transcript text (e.g., earnings call QnA). For each topic, provide a percentage weightage (summing exactly to 100% across all topics) and 3-5 associated keywords (comma-separated). Output the result STRICTLY in HTML format as an ordered list (<ol>), with each list item (<li>) formatted exactly as: "Topic: <topic_name>, Weight: <percentage>%, Keywords: <keyword1>,<keyword2>,<keyword3>,...".
+# Instruction block for extract_topics; only the transcript text varies per
+# call, so the multi-KB prompt is assembled once at import time
+TOPIC_EXTRACTION_PROMPT = """<prompt> You are tasked with extracting the top 5 topics discussed in the provided transcript text (e.g., earnings call QnA). For each topic, provide a percentage weightage (summing exactly to 100% across all topics) and 3-5 associated keywords (comma-separated). Output the result STRICTLY in HTML format as an ordered list (<ol>), with each list item (<li>) formatted exactly as: "Topic: <topic_name>, Weight: <percentage>%, Keywords: <keyword1>,<keyword2>,<keyword3>,...".
 
     Strict Requirements:
     - Analyze ONLY the provided transcript text. Do NOT use external information or infer beyond the text.
@@ -161,20 +180,16 @@ def extract_topics(transcript_text: str) -> str:
         <li>Topic: Sustainability, Weight: 10%, Keywords: eco-friendly, green tech, renewable</li>
     </ol>
 
-    </prompt> <text> {transcript_text} </text>"""
-    return run_orchestration(prompt, error_context="data topic extraction")
+    </prompt>"""
 
-def data_formatter(final_result: str, excel_final_result: str, Image_Result: Optional[List[Dict[str, str]]] = None) -> str:
-    """Format final response as HTML with executive summary, main content, stock analysis, and Excel data."""
-    stock_section = ""
-    if Image_Result:
-        stock_section = "<h2>Stock Analysis</h2><div>"
-        for result in Image_Result:
-            analysis = result.get("analysis", "No stock analysis available")
-            stock_section += f"<p>{analysis}</p>"
-        stock_section += "</div>"
+def extract_topics(transcript_text: str) -> str:
+    """Extract top 5 topics with weights and keywords in HTML format."""
+    prompt = f"{TOPIC_EXTRACTION_PROMPT} <text> {transcript_text} </text>"
+    return run_orchestration(prompt, error_context="data topic extraction")
 
-    prompt = f"""<prompt> Format the final response as HTML content with highlights, bold, and consistent styling. 
+# Formatting instructions are identical for every response; assembled once
+# here and filled per call via .format
+DATA_FORMATTER_PROMPT = """<prompt> Format the final response as HTML content with highlights, bold, and consistent styling.
     Include up to four sections: 
     1. An Executive Summary at the top, written as a single, cohesive paragraph of full sentences, integrating key drivers and precise numbers. The Executive Summary must not contain bullet points, lists, or list-like structures; it should be a narrative flow. Ensure number formatting is consistent, using bn for Billion, mn for Million, YoY for Year over Year, and QoQ for Quarter over Quarter.
     2. The full main content from the input include Excel data as well STRICTLY NO SEPERATE EXCEL SECTION, formatted with any bullet points on new lines, preserving all original details, quotes, and structure.
@@ -183,5 +198,22 @@ def data_formatter(final_result: str, excel_final_result: str, Image_Result: Opt
     Keep all quotes unchanged and do not summarize or alter the content beyond formatting. 
     Output only the formatted HTML content, STRICTLY excluding any introductory text such as 'Here is an HTML-formatted summary ', 'Here is the formatted content..' or 'Here is my analysis of..' or 'Here is an HTML-formatted..'. 
     Consolidate the results and exclude CODA Analysis. 
-    </prompt> <text> {final_result} </text> <stock_section> {stock_section} </stock_section> <excel_section> {excel_final_result} </excel_section>"""   
+    </prompt> <text> {final_result} </text> <stock_section> {stock_section} </stock_section> <excel_section> {excel_final_result} </excel_section>"""
+
+def data_formatter(final_result: str, excel_final_result: str, Image_Result: Optional[List[Dict[str, str]]] = None) -> str:
+    """Format final response as HTML with executive summary, main content, stock analysis, and Excel data."""
+    stock_section = ""
+    if Image_Result:
+        # Build the paragraphs as a list and join once instead of growing a string
+        paragraphs = "".join(
+            f"<p>{result.get('analysis', 'No stock analysis available')}</p>"
+            for result in Image_Result
+        )
+        stock_section = f"<h2>Stock Analysis</h2><div>{paragraphs}</div>"
+
+    prompt = DATA_FORMATTER_PROMPT.format(
+        final_result=final_result,
+        stock_section=stock_section,
+        excel_final_result=excel_final_result
+    )
     return run_orchestration(prompt, error_context="data formatting")
\ No newline at end of file
@@ -3,15 +3,20 @@ import logging
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
-def setup_logger(log_dir='logs', log_file='earnings_analysis.log', level=logging.INFO):
+# Evaluate the DEBUG flag once at import time; the environment does not
+# change during a run, so callers never pay a repeated getenv + lower()
+DEBUG = (os.getenv('DEBUG') or '').lower() == 'true'
+DEFAULT_LOG_LEVEL = logging.DEBUG if DEBUG else logging.INFO
+
+def setup_logger(log_dir='logs', log_file='earnings_analysis.log', level=DEFAULT_LOG_LEVEL):
     """
     Set up and configure a logger instance with rotating file handler.
-    
+
     Args:
         log_dir (str): Directory to store log files
         log_file (str): Name of the log file
         level (int): Logging level (e.g., logging.INFO, logging.DEBUG)
-        
+
     Returns:
         logging.Logger: Configured logger instance
     """
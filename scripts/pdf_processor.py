@@ -1,17 +1,16 @@
 import os
 import time
+import threading
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from gen_ai_hub.proxy.langchain.init_models import init_embedding_model
 from langchain.docstore.document import Document
 import pdfplumber
-import camelot
-import tabula
 from logger_setup import get_logger
 import re
 from env_config import TABLE_NAMES, EMBEDDING_MODEL
-from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_aicore_credentials
+from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_aicore_credentials, token_endpoint
 import requests
 
 
@@ -30,7 +29,7 @@ destination_service_credentials = get_destination_service_credentials(vcap_servi
 # Generate OAuth token for destination service
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -57,19 +56,58 @@ aicore_details = fetch_destination_details(
     
 # Extract AIC Details
 AIC_CREDENTIALS = extract_aicore_credentials(aicore_details)
-logger.info("pdf_processor -> AIC Credential", AIC_CREDENTIALS)
+logger.info(f"pdf_processor -> AIC Credential: {AIC_CREDENTIALS}")
 
 #$$$ EOC: 28.05.25 -- Initialize AIC Credentials --- $$$#
 
 
 
+# Embedding model (and its proxy client) built once on first use: every
+# create_embeddings call was re-authenticating and re-resolving the
+# deployment for the same credentials and model
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+def _get_embedding_model():
+    """Return the shared embedding model, constructing it on first call."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from gen_ai_hub.proxy import GenAIHubProxyClient
+                logger.info(f"PDF Processor: AIC, {AIC_CREDENTIALS}")
+                proxy_client = GenAIHubProxyClient(
+                    base_url=AIC_CREDENTIALS['aic_base_url'],
+                    auth_url=AIC_CREDENTIALS['aic_auth_url'],
+                    client_id=AIC_CREDENTIALS['clientid'],
+                    client_secret=AIC_CREDENTIALS['clientsecret'],
+                    resource_group=AIC_CREDENTIALS['resource_group']
+                )
+                _embedding_model = init_embedding_model(model_name=EMBEDDING_MODEL, proxy_client=proxy_client)
+    return _embedding_model
+
+# Pre-compiled patterns for clean_text, so per-chunk calls skip regex compilation
+RE_JPMORGAN = re.compile(r"JPHORGAN", re.IGNORECASE)
+RE_EXCEPT = re.compile(r"excape", re.IGNORECASE)
+RE_WHITESPACE = re.compile(r"\s+")
+# Numeric-cell check used on every header cell of every extracted table
+RE_NUMERIC_CELL = re.compile(r"^\$?\d[\d,.]*$")
+
+# Splitter settings never change, so one stateless instance is shared by all
+# process_pdf calls instead of constructing a new one per file
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1000,
+    chunk_overlap=200,
+    length_function=len
+)
+
 def clean_text(text):
     """Clean OCR artifacts and normalize text."""
     if not text:
         return ""
-    text = re.sub(r"JPHORGAN", "JPMORGAN", text, flags=re.IGNORECASE)
-    text = re.sub(r"excape", "except", text, flags=re.IGNORECASE)
-    text = re.sub(r"\s+", " ", text).strip()  # Normalize whitespace
+    text = RE_JPMORGAN.sub("JPMORGAN", text)
+    text = RE_EXCEPT.sub("except", text)
+    text = RE_WHITESPACE.sub(" ", text).strip()  # Normalize whitespace
     return text
 
 def table_to_text(table_data, source_file, page_num, source_tool="pdfplumber"):
@@ -92,7 +130,7 @@ def table_to_text(table_data, source_file, page_num, source_tool="pdfplumber"):
         return ""
     text = []
     headers = table_data[0]
-    if all(re.match(r"^\$?\d[\d,.]*$", str(cell).strip()) for cell in headers if str(cell).strip()):
+    if all(RE_NUMERIC_CELL.match(str(cell).strip()) for cell in headers if str(cell).strip()):
         headers = ["Column " + str(i) for i in range(len(headers))]  # Fallback if no clear header
     else:
         table_data = table_data[1:]  # Skip header row
@@ -107,6 +145,11 @@ def table_to_text(table_data, source_file, page_num, source_tool="pdfplumber"):
 def process_pdf(pdf_path):
     """Extract text and tables from a PDF file, returning chunks."""
     logger.info(f"Processing PDF: {pdf_path}")
+    # Imported here rather than at module level: camelot and tabula pull in
+    # heavy dependency stacks that would otherwise slow every worker start,
+    # and only this table-fallback path needs them
+    import camelot
+    import tabula
     try:
         # Step 1: Extract text with PyPDFLoader
         loader = PyPDFLoader(pdf_path)
@@ -174,12 +217,7 @@ def process_pdf(pdf_path):
             logger.warning(f"No chunks created from {filename}")
             return []
         # Step 3: Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
-        )
-        chunks = text_splitter.split_documents(all_docs)
+        chunks = TEXT_SPLITTER.split_documents(all_docs)
         if not chunks:
             logger.warning(f"No chunks created from {filename}")
             return []
@@ -196,21 +234,7 @@ def create_embeddings(docs, model_name=EMBEDDING_MODEL, batch_size=400):
         return [], 1
     logger.info(f"Creating embeddings for {len(docs)} docs with {model_name}")
     try:
-    ### SOC: Initialize Embedding Models ### 
-        from gen_ai_hub.proxy import GenAIHubProxyClient
-        logger.info("PDF Processor: AIC, {AIC_CREDENTIALS}")
-
-        proxy_client = GenAIHubProxyClient(
-                                    base_url = AIC_CREDENTIALS['aic_base_url'],
-                                    auth_url = AIC_CREDENTIALS['aic_auth_url'],
-                                    client_id = AIC_CREDENTIALS['clientid'],
-                                    client_secret = AIC_CREDENTIALS['clientsecret'],
-                                    resource_group = AIC_CREDENTIALS['resource_group']
-                                    )
-
-        embedding_model = init_embedding_model(model_name = EMBEDDING_MODEL, proxy_client=proxy_client)
-    ### EOC: Initialize Embedding Models ### 
-
+        embedding_model = _get_embedding_model()
         logger.info(f"Embedding model initialized: {embedding_model}")
         results = []
         for i in range(0, len(docs), batch_size):
@@ -350,12 +374,13 @@ def process_all_pdfs(directory, model=EMBEDDING_MODEL):
             print(f"❌ File not readable: {pdf_path}")
             return None, False
         
+        # Classify the file before the log below that reads is_transcript
+        filename = os.path.basename(pdf_path)
+        is_transcript = 'transcript' in filename.lower()
+
         file_size = os.path.getsize(pdf_path)
         logger.info(f"Processing {pdf} - Size: {file_size} bytes, Type: {'Transcript' if is_transcript else 'Non-transcript'}")
         print(f"📊 File size: {file_size:,} bytes")
-        
-        filename = os.path.basename(pdf_path)
-        is_transcript = 'transcript' in filename.lower()
         print(f"🏷️  File type: {'Transcript' if is_transcript else 'Non-transcript'}")
         
         try:
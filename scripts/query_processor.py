@@ -6,23 +6,59 @@ from coda_analyzer import generate_coda_prompt
 from logger_setup import get_logger
 from langchain_community.vectorstores import HanaDB
 from image_processor import process_images
+import logging
 import os
 
 logger = get_logger()
 
+# Resolved once at import; the local path cannot change while the app runs
+IMAGES_FOLDER = os.path.join(os.getenv('LOCALPATH', ''), "Images")
+
+# Already lowercased so the per-query check needs no re-lowering
+STOCK_KEYWORDS = ("stock", "share price", "stock analysis", "stock insights")
+
+# Retriever settings never vary per query, so the kwargs dicts are built once
+# and shared by reference instead of being reconstructed on every request.
+# Retrievers only read them, so sharing is safe.
+RETRIEVER_SEARCH_TYPE = "similarity_score_threshold"
+RETRIEVER_SEARCH_KWARGS = {"k": 30, "score_threshold": 0.6}
+EXCEL_SEARCH_KWARGS = {"k": 30, "score_threshold": 0.8}
+
+# Final-analysis prompt; the requirements block is static, so only the
+# per-query sections are filled in via .format
+INTEGRATED_PROMPT_TEMPLATE = """
+        Tasks: {tasks}
+        CODA Data: {data_requirements}
+        Contexts: {contexts}
+        Transcript Context: {transcript_context}
+        Query: {query}
+        Requirements:
+        - Do not hallucinate. If there is no data for Specified Bank, STRICTLY state 'Data not Available'.
+        - Integrate tasks with CODA analysis
+        - Use bullets for financials, quotes, callouts. Support with Driver Details.
+        - Quotes from Transcript Context only, STRICTLY with Speaker Details
+        - Financials, callouts, consensus from Contexts only
+        - State 'Data not available' if no non-transcript data
+        - Format cohesively with confidence metrics
+        - DBS Bank and Deutsche Banking Services are distinct entities and should not be regarded as the same.
+        """
+
+# Summary templates are static; built once instead of per call. Keys are
+# lowercase to match the .lower() lookup in generate_summary_template
+SUMMARY_TEMPLATES = {
+    "financial": "Financial summary for '{query}': Use {context} for metrics; reject transcript data. Use {transcript_context} for quotes only. Note if data insufficient.",
+    "trend": "Outlook for '{query}': Use {context} for trends; reject transcript data. Use {transcript_context} for quotes with speaker details. State if unclear.",
+    "general": "Key points for '{query}': Use {context} only; no quotes unless specified.",
+    "topics": "Top 5 topics for '{query}': Use {transcript_context} (QnA only) to extract top 5 topics with percentage weightage (summing to 100%) and keywords in HTML format as an ordered list. Exclude financial metrics, summaries, or external data.",
+    "quotes": "Top 5 management quotes for '{query}': Use {transcript_context} (transcript only) to extract up to 5 quotes from company management (e.g., CEO, CFO) with speaker details in HTML format as an ordered list. Exclude financial metrics or external data.",
+    "callouts": "Major callouts for '{query}': Use {context} for bullet-point drivers. Note if unclear.",
+    "consensus": "Consensus for '{query}': Use {context} for drivers. Note limitations if insufficient.",
+    "stock": "Stock analysis for '{query}': Use {context} for price and volume trends; include technical indicators. Use {transcript_context} for management commentary only. Note if data insufficient."
+}
+
 def generate_summary_template(context: str, query: str, analysis_type: str = "general", transcript_context: str = None) -> str:
     """Create a concise summary template based on analysis type."""
-    templates = {
-        "financial": "Financial summary for '{query}': Use {context} for metrics; reject transcript data. Use {transcript_context} for quotes only. Note if data insufficient.",
-        "trend": "Outlook for '{query}': Use {context} for trends; reject transcript data. Use {transcript_context} for quotes with speaker details. State if unclear.",
-        "general": "Key points for '{query}': Use {context} only; no quotes unless specified.",
-        "topics": "Top 5 topics for '{query}': Use {transcript_context} (QnA only) to extract top 5 topics with percentage weightage (summing to 100%) and keywords in HTML format as an ordered list. Exclude financial metrics, summaries, or external data.",
-        "quotes": "Top 5 management quotes for '{query}': Use {transcript_context} (transcript only) to extract up to 5 quotes from company management (e.g., CEO, CFO) with speaker details in HTML format as an ordered list. Exclude financial metrics or external data.",
-        "callouts": "Major callouts for '{query}': Use {context} for bullet-point drivers. Note if unclear.",
-        "consensus": "Consensus for '{query}': Use {context} for drivers. Note limitations if insufficient.",
-        "Stock": "Stock analysis for '{query}': Use {context} for price and volume trends; include technical indicators. Use {transcript_context} for management commentary only. Note if data insufficient."
-    }
-    template = templates.get(analysis_type.lower(), templates["general"])
+    template = SUMMARY_TEMPLATES.get(analysis_type.lower(), SUMMARY_TEMPLATES["general"])
     return template.format(
         query=query, 
         context=context, 
@@ -34,34 +70,34 @@ def fetch_context(retriever, query: str, k: int = 30) -> str:
     try:
         docs = retriever.invoke(query)
         context = format_documents(docs) if docs else "No documents found."
-        logger.debug(f"Fetched context for query '{query[:50]}...': {context[:100]}... (length: {len(context)})")
+        # Guard so the context slices/len aren't built when debug is off
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Fetched context for query '{query[:50]}...': {context[:100]}... (length: {len(context)})")
         return context
     except Exception as e:
         logger.error(f"Retrieval failed: {str(e)}")
         return f"Error: {str(e)}"
 
-def process_analysis_type(
-    analysis_type: str, user_query: str, transcript_store, non_transcript_store, transcript_context: str
-) -> Tuple[str, str, str]:
-    """Process an individual analysis type."""
-    try:
-        logger.debug(f"Processing analysis type '{analysis_type}' with user_query: '{user_query[:50]}...' and transcript_context: {transcript_context[:100]}... (length: {len(transcript_context)})")
-        if analysis_type == "topics":
-            # Validate transcript_context for topics
-            if not transcript_context or transcript_context.startswith("Error") or len(transcript_context.strip()) < 50:
-                logger.warning(f"Invalid or insufficient transcript_context for topics: {transcript_context[:100]}...")
-                task = "<ol><li>Topic: None, Weight: 100%, Keywords: none</li></ol>"
-            else:
-                task = extract_topics(transcript_context)
-                # Validate task output
-                if not task.startswith("<ol>") or not task.endswith("</ol>"):
-                    logger.warning(f"Invalid topics output: {task[:100]}...")
-                    task = "<ol><li>Topic: None, Weight: 100%, Keywords: none</li></ol>"
-            context = transcript_context
-            logger.debug(f"Topics task result: {task[:100]}...")
-        elif analysis_type == "quotes":
-            # Create prompt for quotes extraction, using the raw user query
-            prompt = f"""<prompt> You are tasked with extracting up to 5 quotes from company management (e.g., CEO, CFO, executives) in the provided transcript text, specifically relevant to the user's request: '{user_query}'. Each quote must include the speaker's name and role (if available). Output the result STRICTLY in HTML format as an ordered list (<ol>), with each list item (<li>) formatted exactly as: "<quote>" - <speaker> (<role>).
+def _topics_task(user_query: str, transcript_context: str) -> str:
+    """Extract top topics from the transcript context."""
+    # Validate transcript_context for topics
+    if not transcript_context or transcript_context.startswith("Error") or len(transcript_context.strip()) < 50:
+        logger.warning(f"Invalid or insufficient transcript_context for topics: {transcript_context[:100]}...")
+        task = "<ol><li>Topic: None, Weight: 100%, Keywords: none</li></ol>"
+    else:
+        task = extract_topics(transcript_context)
+        # Validate task output
+        if not task.startswith("<ol>") or not task.endswith("</ol>"):
+            logger.warning(f"Invalid topics output: {task[:100]}...")
+            task = "<ol><li>Topic: None, Weight: 100%, Keywords: none</li></ol>"
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Topics task result: {task[:100]}...")
+    return task
+
+# Quotes-extraction instructions assembled once at import; only the user
+# request and transcript text vary per call, filled in via .format like the
+# summary templates above
+QUOTES_PROMPT_TEMPLATE = """<prompt> You are tasked with extracting up to 5 quotes from company management (e.g., CEO, CFO, executives) in the provided transcript text, specifically relevant to the user's request: '{user_query}'. Each quote must include the speaker's name and role (if available). Output the result STRICTLY in HTML format as an ordered list (<ol>), with each list item (<li>) formatted exactly as: "<quote>" - <speaker> (<role>).
 
             Strict Requirements:
             - Analyze ONLY the provided transcript text. Do NOT use external information or infer beyond the text.
@@ -91,20 +127,45 @@ def process_analysis_type(
             </ol>
 
             </prompt> <text> {transcript_context} </text>"""
-            if not transcript_context or transcript_context.startswith("Error"):
-                logger.warning("No valid transcript_context for quotes")
-                task = "<ol><li>Quote: None, Speaker: None (None)</li></ol>"
-            else:
-                task = run_orchestration(prompt, error_context="quote extraction")
+
+def _quotes_task(user_query: str, transcript_context: str) -> str:
+    """Extract management quotes relevant to the user's request."""
+    # Fill in the user request and transcript text; the instructions are static
+    prompt = QUOTES_PROMPT_TEMPLATE.format(user_query=user_query, transcript_context=transcript_context)
+    if not transcript_context or transcript_context.startswith("Error"):
+        logger.warning("No valid transcript_context for quotes")
+        task = "<ol><li>Quote: None, Speaker: None (None)</li></ol>"
+    else:
+        task = run_orchestration(prompt, error_context="quote extraction")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Quotes task result: {task[:100]}...")
+    return task
+
+# Transcript-backed analysis handlers resolved by one dict lookup instead of
+# walking an if/elif chain per analysis type
+_TRANSCRIPT_TASKS = {
+    "topics": _topics_task,
+    "quotes": _quotes_task,
+}
+
+def process_analysis_type(
+    analysis_type: str, user_query: str, transcript_store, non_transcript_store, transcript_context: str
+) -> Tuple[str, str, str]:
+    """Process an individual analysis type."""
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Processing analysis type '{analysis_type}' with user_query: '{user_query[:50]}...' and transcript_context: {transcript_context[:100]}... (length: {len(transcript_context)})")
+        handler = _TRANSCRIPT_TASKS.get(analysis_type)
+        if handler is not None:
+            task = handler(user_query, transcript_context)
             context = transcript_context
-            logger.debug(f"Quotes task result: {task[:100]}...")
         else:
             # Other analysis types use non-transcript store
             store = non_transcript_store
-            retriever = store.as_retriever(search_kwargs={"k": 30, "score_threshold": 0.6}, search_type="similarity_score_threshold") 
+            retriever = store.as_retriever(search_kwargs=RETRIEVER_SEARCH_KWARGS, search_type=RETRIEVER_SEARCH_TYPE)
             context = fetch_context(retriever, user_query)
             task = generate_summary_template(context, user_query, analysis_type, transcript_context)
-        
+
         return analysis_type, task, context
     except Exception as e:
         logger.error(f"Processing {analysis_type} failed: {str(e)}")
@@ -113,7 +174,7 @@ def process_analysis_type(
 def process_excel_only_query(query: str, excel_non_transcript_store: HanaDB) -> str:
     """Process Excel query efficiently."""
     try:
-        retriever = excel_non_transcript_store.as_retriever(search_kwargs={"k": 30, "score_threshold": 0.8}, search_type="similarity_score_threshold") 
+        retriever = excel_non_transcript_store.as_retriever(search_kwargs=EXCEL_SEARCH_KWARGS, search_type=RETRIEVER_SEARCH_TYPE)
         context = fetch_context(retriever, query)
         return context if context and not context.startswith("Error") else "No Excel data"
     except Exception as e:
@@ -141,7 +202,7 @@ def process_query(
         logger.debug(f"Processing query: {clean_query}, analysis types: {analysis_types}")
 
         # Fetch transcript context (required for quotes and topics)
-        transcript_context = fetch_context(transcript_store.as_retriever(search_kwargs={"k": 30, "score_threshold": 0.6}, search_type="similarity_score_threshold"), clean_query)
+        transcript_context = fetch_context(transcript_store.as_retriever(search_kwargs=RETRIEVER_SEARCH_KWARGS, search_type=RETRIEVER_SEARCH_TYPE), clean_query)
 
         # Special case: Only quotes requested
         if analysis_types == ["quotes"]:
@@ -168,9 +229,9 @@ def process_query(
         data_requirements = extract_data_requirements(coda_prompt)
         refined_query = f"{clean_query} {data_requirements}"
 
-        # Check for stock-related query
-        stock_keywords = ["stock", "share price", "stock analysis", "stock insights"]
-        is_stock_query = any(keyword.lower() in query.lower() for keyword in stock_keywords)
+        # Check for stock-related query; lower the query once, not per keyword
+        query_lower = query.lower()
+        is_stock_query = any(keyword in query_lower for keyword in STOCK_KEYWORDS)
 
         # Parallel processing of image processing, analysis types, and Excel query
         image_results = []
@@ -183,8 +244,7 @@ def process_query(
 
             # Submit image processing task if stock query
             if is_stock_query:
-                base_path = os.getenv('LOCALPATH', '')
-                folder_path = os.path.join(base_path, "Images")
+                folder_path = IMAGES_FOLDER
                 user_prompt = query
                 if not os.path.exists(folder_path):
                     logger.error(f"Image folder does not exist: {folder_path}")
@@ -232,23 +292,14 @@ def process_query(
                         logger.error(f"Excel query failed: {str(e)}")
                         excel_result = f"Error: {str(e)}"
 
-        # Create integrated prompt
-        integrated_prompt = f"""
-        Tasks: {', '.join(tasks.values())}
-        CODA Data: {data_requirements}
-        Contexts: {str(contexts)}
-        Transcript Context: {transcript_context}
-        Query: {query}
-        Requirements:
-        - Do not hallucinate. If there is no data for Specified Bank, STRICTLY state 'Data not Available'.
-        - Integrate tasks with CODA analysis
-        - Use bullets for financials, quotes, callouts. Support with Driver Details.
-        - Quotes from Transcript Context only, STRICTLY with Speaker Details
-        - Financials, callouts, consensus from Contexts only
-        - State 'Data not available' if no non-transcript data
-        - Format cohesively with confidence metrics
-        - DBS Bank and Deutsche Banking Services are distinct entities and should not be regarded as the same.
-        """
+        # Create integrated prompt from the static template defined at module level
+        integrated_prompt = INTEGRATED_PROMPT_TEMPLATE.format(
+            tasks=', '.join(tasks.values()),
+            data_requirements=data_requirements,
+            contexts=str(contexts),
+            transcript_context=transcript_context,
+            query=query
+        )
 
         # Execute and format final response
         final_analysis = execute_final_analysis(integrated_prompt)
@@ -3,7 +3,6 @@ from pickle import NONE
 import time
 import logging
 from logging.handlers import RotatingFileHandler
-import json
 import requests
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -14,7 +13,7 @@ from db_connection import load_vector_stores
 from query_processor import process_query
 from embedding_storer import process_and_store_embeddings
 from api_client import download_embedding_files, update_completed_files
-from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_hana_credentials,extract_aicore_credentials
+from destination_srv import get_destination_service_credentials, generate_token, fetch_destination_details,extract_hana_credentials,extract_aicore_credentials, token_endpoint
 from xsuaa_srv import get_xsuaa_credentials, verify_jwt_token, require_auth
 from fastapi import HTTPException  # Ensure HTTPException is imported for error handling
 import shutil
@@ -36,11 +35,11 @@ logger.info('CORS Disabled')
 # Set directories
 LOCALPATH = os.getenv('LOCALPATH', os.getcwd())
 documents_dir = os.path.join(LOCALPATH, "Documents")
-logger.info("Document Directory", documents_dir)
+logger.info(f"Document Directory: {documents_dir}")
 images_dir = os.path.join(LOCALPATH, "Images")
-logger.info("Image Library",images_dir)
+logger.info(f"Image Library: {images_dir}")
 logs_dir = os.path.join(LOCALPATH, "logs")
-logger.info("Log Directory", logs_dir)
+logger.info(f"Log Directory: {logs_dir}")
 os.makedirs(documents_dir, exist_ok=True)
 os.makedirs(images_dir, exist_ok=True)
 os.makedirs(logs_dir, exist_ok=True)
@@ -87,7 +86,7 @@ logger.info(f"Destination Service Credentials: {destination_service_credentials}
 # Generate OAuth token for destination service
 try:
     oauth_token = generate_token(
-        uri=destination_service_credentials['dest_auth_url'] + "/oauth/token",
+        uri=token_endpoint(destination_service_credentials['dest_auth_url']),
         client_id=destination_service_credentials['clientid'],
         client_secret=destination_service_credentials['clientsecret']
     )
@@ -283,9 +282,12 @@ def upload_file():
         client_ip = request.remote_addr
         current_time = int(time.time())
         hour_ago = current_time - 3600
-        upload_counts[client_ip] = [t for t in upload_counts.get(client_ip, []) if t > hour_ago]
-        
-        if len(upload_counts.get(client_ip, [])) >= UPLOAD_LIMIT:
+        # Prune once, keep the list, and reuse it for the limit check and the
+        # append below instead of re-looking the key up three times
+        recent_uploads = [t for t in upload_counts.get(client_ip, []) if t > hour_ago]
+        upload_counts[client_ip] = recent_uploads
+
+        if len(recent_uploads) >= UPLOAD_LIMIT:
             logger.warning(f"Upload limit reached for IP {client_ip}")
             return jsonify({"error": "Upload limit reached"}), 429
         
@@ -322,7 +324,7 @@ def upload_file():
             return jsonify({"error": f"File too large. Max {MAX_FILE_SIZE//1024//1024}MB"}), 400
         
         file.save(file_path)
-        upload_counts.setdefault(client_ip, []).append(current_time)
+        recent_uploads.append(current_time)
         logger.info(f"File uploaded: {filename} to {target_dir}")
 
         # Store metadata in HANA
@@ -374,9 +376,16 @@ def generate_embeddings():
 
     # Step 2: Categorize files
     logger.info("Step 7: Categorizing files")
-    transcripts = [f for f in downloaded_files if f.endswith(('.txt', '.docx', '.doc'))]
-    non_transcripts = [f for f in downloaded_files if f.endswith(('.pdf', '.xlsx'))]
-    images = [f for f in downloaded_files if f.endswith(tuple(IMAGE_EXTENSIONS))]
+    # Single pass over the downloaded list instead of one scan per category
+    transcripts, non_transcripts, images = [], [], []
+    image_suffixes = tuple(IMAGE_EXTENSIONS)
+    for f in downloaded_files:
+        if f.endswith(('.txt', '.docx', '.doc')):
+            transcripts.append(f)
+        elif f.endswith(('.pdf', '.xlsx')):
+            non_transcripts.append(f)
+        elif f.endswith(image_suffixes):
+            images.append(f)
 
     logger.info(f"Step 8: Categorized files - Transcripts: {len(transcripts)}, Non-Transcripts: {len(non_transcripts)}, Images: {len(images)}")
 
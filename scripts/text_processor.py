@@ -1,3 +1,4 @@
+import re
 from logger_setup import get_logger
 from typing import Tuple, List
 
@@ -13,36 +14,55 @@ def format_documents(docs):
     logger.debug(f"Documents formatted, total length: {len(formatted)} characters")
     return formatted
 
+# Analysis-type vocabulary, split once at import time into multi-word and
+# single-word terms so parse_query avoids rebuilding these tables per call
+ANALYSIS_TERMS = {
+    "general": ["summarize", "summary", "summarization"],
+    "financial": ["finance", "financial", "revenue", "profit", "earnings", "income", "balance sheet", "impairments", "highlights"],
+    "trend": ["trend", "trends", "growth", "decline", "change over time", "outlook"],
+    "topics": ["topics", "themes", "breakdown", "categorize", "categorization", "topic breakdown", "topic analysis"],
+    "quotes": ["quote", "quotes", "statement", "statements"],
+    "callouts": ["callouts", "major callouts"],
+    "consensus": ["consensus"],
+    "Stock": ["Stock, Share Price Analysis"]
+}
+# Terms are lowered once here: the matching below compares against the
+# lowercased query, so mixed-case vocabulary entries could never match
+_MULTI_WORD_TERMS = {
+    atype: tuple(t.lower() for t in terms if len(t.split()) > 1)
+    for atype, terms in ANALYSIS_TERMS.items()
+}
+_SINGLE_WORD_TERMS = {
+    atype: frozenset(t.lower() for t in terms if len(t.split()) == 1)
+    for atype, terms in ANALYSIS_TERMS.items()
+}
+_ALL_TERMS = tuple(term.lower() for terms in ANALYSIS_TERMS.values() for term in terms)
+# Alternation compiled once (longest terms first so e.g. "topic breakdown"
+# wins over "breakdown"); strips every term from the query in one C-level pass
+_TERMS_RE = re.compile('|'.join(
+    re.escape(term) for term in sorted(_ALL_TERMS, key=len, reverse=True)
+))
+
 def parse_query(query: str) -> Tuple[str, List[str]]:
     """Identify analysis types and clean the query."""
     logger.info(f"Parsing analysis request: '{query}'")
     query_lower = query.lower()
-    analysis_terms = {
-        "general": ["summarize", "summary", "summarization"],
-        "financial": ["finance", "financial", "revenue", "profit", "earnings", "income", "balance sheet", "impairments", "highlights"],
-        "trend": ["trend", "trends", "growth", "decline", "change over time", "outlook"],
-        "topics": ["topics", "themes", "breakdown", "categorize", "categorization", "topic breakdown", "topic analysis"],
-        "quotes": ["quote", "quotes", "statement", "statements"],
-        "callouts": ["callouts", "major callouts"],
-        "consensus": ["consensus"],
-        "Stock": ["Stock, Share Price Analysis"]
-    }
     detected_types = []
-    for analysis_type, terms in analysis_terms.items():
+    for analysis_type, terms in _MULTI_WORD_TERMS.items():
         for term in terms:
-            if term in query_lower and len(term.split()) > 1:
+            if term in query_lower:
                 if analysis_type not in detected_types:
                     detected_types.append(analysis_type)
     if not detected_types:
-        for analysis_type, terms in analysis_terms.items():
-            if any(term in query_lower.split() for term in terms if len(term.split()) == 1):
+        query_words = set(query_lower.split())
+        for analysis_type, terms in _SINGLE_WORD_TERMS.items():
+            # Set intersection instead of a Python-level term loop
+            if query_words & terms:
                 if analysis_type not in detected_types:
                     detected_types.append(analysis_type)
     if not detected_types:
         logger.info("No specific analysis type detected, defaulting to 'general'")
         return query, ["general"]
-    cleaned_query = query
-    for term in sum(analysis_terms.values(), []):
-        cleaned_query = cleaned_query.replace(term, "").strip()
+    cleaned_query = _TERMS_RE.sub("", query).strip()
     logger.info(f"Detected analysis types: {detected_types}, cleaned query='{cleaned_query}'")
     return cleaned_query, detected_types
\ No newline at end of file
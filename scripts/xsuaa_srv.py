@@ -1,19 +1,21 @@
 import os
-import json
+import orjson
 import requests
 import logging
 from sap import xssec
 from fastapi import HTTPException
 import jwt
-from flask import request, jsonify
-from functools import wraps
+from flask import current_app, request, jsonify
+from functools import lru_cache, wraps
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_xsuaa_credentials(vcap_services):
-    print(f"VCAP_SERVICES: {vcap_services}")
-    vcap_services = json.loads(vcap_services)
+    # VCAP_SERVICES is fixed for the process lifetime, so the full JSON parse
+    # runs once; repeat callers get the cached credential dict
+    vcap_services = orjson.loads(vcap_services)
     xsuaa = vcap_services["xsuaa"][0]["credentials"]
     xsuaa_clientid = xsuaa.get("clientid")
     xsuaa_clientsecret = xsuaa.get("clientsecret")
@@ -37,8 +39,12 @@ def get_xsuaa_credentials(vcap_services):
 
 def verify_jwt_token(token, uaa_credentials, required_scope="uaa.resource"):
     try:
-        decoded = jwt.decode(token, options={"verify_signature": False})
-        logger.debug(f"Decoded JWT: {decoded}")
+        # The unverified decode exists only to log the claims, so skip the
+        # whole parse when debug output is off; xssec below does the real
+        # verification either way
+        if logger.isEnabledFor(logging.DEBUG):
+            decoded = jwt.decode(token, options={"verify_signature": False})
+            logger.debug(f"Decoded JWT: {decoded}")
         security_context = xssec.create_security_context(token, uaa_credentials)
         if not security_context.check_scope(required_scope):
             logger.warning(f"Token missing required scope: {required_scope}")
@@ -61,7 +67,6 @@ def require_auth(f):
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        from flask import current_app
         auth_header = request.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
             return jsonify({'error': 'Authorization header missing or invalid'}), 401